@@ -1,19 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
+import re
+import html
 import json
 import time
-from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
 import logging
 from logging.handlers import RotatingFileHandler
-import gc
 import signal
-import sys
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import hashlib
-from functools import lru_cache
+import sqlite3
+import random
+import xxhash
 
 # Configure logging
 def setup_logging():
@@ -59,6 +57,7 @@ load_dotenv()
 DISCORD_WEBHOOK_URL = os.getenv('DISCORD_WEBHOOK_URL')
 NASDAQ_URL = os.getenv('NASDAQ_URL', 'https://listingcenter.nasdaq.com/rulebook/nasdaq/rulefilings')
 CHECK_INTERVAL = float(os.getenv('CHECK_INTERVAL', '0.5'))  # Default to 0.5 seconds (500ms)
+CHECK_JITTER = float(os.getenv('CHECK_JITTER', '0.05'))  # Default to up to 0.05 seconds of extra delay
 ERROR_RETRY_INTERVAL = int(os.getenv('ERROR_RETRY_INTERVAL', '30'))  # Default to 30 seconds
 REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '10'))  # Default to 10 seconds
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))  # Default to 3 retries
@@ -66,7 +65,17 @@ CACHE_DURATION = float(os.getenv('CACHE_DURATION', '0.5'))  # Default to 0.5 sec
 RATE_LIMIT_WINDOW = int(os.getenv('RATE_LIMIT_WINDOW', '60'))  # Default to 60 seconds
 MAX_REQUESTS_PER_WINDOW = int(os.getenv('MAX_REQUESTS_PER_WINDOW', '120'))  # Default to 120 requests per minute
 
-# File to store seen entries
+# Discord webhook message limits
+DISCORD_MAX_EMBEDS = 10
+DISCORD_MAX_EMBED_CHARS = 6000
+DISCORD_MAX_TITLE_CHARS = 256
+DISCORD_MAX_DESCRIPTION_CHARS = 4096
+DISCORD_MAX_FIELD_VALUE_CHARS = 1024
+
+# Database to store seen entries
+SEEN_ENTRIES_DB = 'seen_entries.db'
+
+# Legacy file of seen entries, imported into the database on first run
 SEEN_ENTRIES_FILE = 'seen_entries.json'
 
 # Rate limiting tracking
@@ -88,130 +97,216 @@ def is_rate_limited():
     request_timestamps.append(current_time)
     return False
 
-# Configure requests session with optimized retry strategy
-def create_session():
-    """Create a requests session with optimized retry strategy."""
-    session = requests.Session()
-    retry_strategy = Retry(
-        total=MAX_RETRIES,
-        backoff_factor=0.5,  # Reduced backoff factor for faster retries
-        status_forcelist=[429, 500, 502, 503, 504]
+# Status codes that are retried with backoff
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Longest single wait between retries, in seconds (matches urllib3's Retry.BACKOFF_MAX)
+BACKOFF_MAX = 120
+
+# Errors raised before a request reaches the server, so retrying cannot duplicate it.
+# Read/write and protocol errors are excluded: they can happen after the server
+# has already accepted the request.
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Configure httpx client with HTTP/2 and a pooled keep-alive connection limit
+def create_client():
+    """Create an httpx client with HTTP/2 and connection pooling."""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(max_connections=20, keepalive_expiry=60),
+        follow_redirects=True
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=10)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
 
-# Global session
-session = create_session()
+# Global client, created in main() once the event loop is running
+client = None
+
+def get_retry_after(response, default):
+    """Return the delay requested by a response's Retry-After header, in seconds."""
+    try:
+        return min(max(0.0, float(response.headers['Retry-After'])), BACKOFF_MAX)
+    except (KeyError, ValueError):
+        return default
+
+async def request_with_retry(method, url, idempotent=True, **kwargs):
+    """Perform an HTTP request, retrying transient failures with backoff.
+
+    Non-idempotent requests are only retried when the server certainly did not
+    process them: failures to connect and 429 responses.
+    """
+    retry_errors = httpx.TransportError if idempotent else CONNECT_ERRORS
+    retry_status_codes = RETRY_STATUS_CODES if idempotent else {429}
+    for attempt in range(MAX_RETRIES + 1):
+        delay = min(0.5 * (2 ** attempt), BACKOFF_MAX)  # Reduced backoff factor for faster retries
+        try:
+            response = await client.request(method, url, **kwargs)
+        except retry_errors:
+            if attempt == MAX_RETRIES:
+                raise
+        else:
+            if response.status_code not in retry_status_codes or attempt == MAX_RETRIES:
+                return response
+            if response.status_code == 429:
+                delay = get_retry_after(response, delay)
+        await asyncio.sleep(delay)
 
 # Cache for storing page content
-page_cache = {
-    'content': None,
-    'timestamp': 0,
-    'hash': None
-}
+_cache_content = None
+_cache_ts = 0.0
+_cache_hash = None
+
+# HTTP validators of the cached page, used for conditional requests
+_etag = None
+_last_modified = None
 
 def get_page_hash(content):
-    """Generate a hash of the page content for change detection."""
-    return hashlib.md5(content.encode()).hexdigest()
-
-@lru_cache(maxsize=100)
-def parse_table_row(row):
-    """Parse a table row with caching for better performance."""
-    cells = row.find_all('td')
-    if len(cells) < 6:
+    """Generate a hash of the tab section content for change detection."""
+    return xxhash.xxh3_64_hexdigest(content)
+
+# Precompiled patterns for the rule filings table
+TAB_CONTENT_RE = re.compile(
+    rb'<div\b(?=[^>]*\bid="NASDAQ-tab-2025")(?=[^>]*\bclass="[^"]*\btab-content\b)[^>]*>', re.IGNORECASE
+)
+TABLE_RE = re.compile(rb'<table\b[^>]*\bwidth="100%"[^>]*>(.*?)</table>', re.IGNORECASE | re.DOTALL)
+ROW_RE = re.compile(rb'<tr\b[^>]*>(.*?)</tr>', re.IGNORECASE | re.DOTALL)
+CELL_RE = re.compile(rb'<td\b[^>]*>(.*?)</td>', re.IGNORECASE | re.DOTALL)
+LINK_RE = re.compile(rb'<a\b[^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(rb'<[^>]+>')
+DIV_TAG_RE = re.compile(rb'<(/?)div\b[^>]*>', re.IGNORECASE)
+
+def find_tab_section(content):
+    """Return the bytes of the NASDAQ tab content div, or None if it is missing."""
+    tab_content = TAB_CONTENT_RE.search(content)
+    if not tab_content:
         return None
-        
-    rule_filing_cell = cells[0]
-    rule_filing_id = rule_filing_cell.find('a').text.strip() if rule_filing_cell.find('a') else ''
     
-    if not rule_filing_id:
+    # Walk the div tags after the opening tag to find its matching close
+    depth = 1
+    for tag in DIV_TAG_RE.finditer(content, tab_content.end()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return content[tab_content.start():tag.end()]
+    return content[tab_content.start():]
+
+def cell_text(cell):
+    """Extract the plain text of an HTML cell."""
+    return html.unescape(TAG_RE.sub(b'', cell).decode('utf-8', 'replace')).strip()
+
+def get_rule_filing_id(row):
+    """Return the rule filing ID linked in a row's first cell, and that cell's match."""
+    first_cell = CELL_RE.search(row)
+    link = LINK_RE.search(first_cell.group(1)) if first_cell else None
+    return (cell_text(link.group(1)) if link else ''), first_cell
+
+def parse_table_row(row, seen_entries=()):
+    """Parse a table row into an entry dict, skipping rows already seen."""
+    rule_filing_id, first_cell = get_rule_filing_id(row)
+    
+    # Most rows are unchanged between checks, so bail out before parsing the rest
+    if not rule_filing_id or rule_filing_id in seen_entries:
+        return None
+        
+    cells = CELL_RE.findall(row, first_cell.end())
+    if len(cells) < 5:
         return None
         
+    description, status, sec_notice, comment_period, notice_date = [
+        cell_text(cell) for cell in cells[:5]
+    ]
     return {
         'Rule Filing': rule_filing_id,
-        'Description': cells[1].text.strip(),
-        'Status': cells[2].text.strip(),
-        'Noticed by the SEC for Comment': cells[3].text.strip(),
-        'Expiration of the SEC Comment Period': cells[4].text.strip(),
-        'Federal Register Notice Date': cells[5].text.strip()
+        'Description': description,
+        'Status': status,
+        'Noticed by the SEC for Comment': sec_notice,
+        'Expiration of the SEC Comment Period': comment_period,
+        'Federal Register Notice Date': notice_date
     }
 
-def scrape_nasdaq():
-    """Scrape the Nasdaq rule filings page with caching."""
-    global page_cache
+async def scrape_nasdaq(seen_entries=()):
+    """Scrape the Nasdaq rule filings page with caching, skipping seen entries."""
+    global _cache_content, _cache_ts, _cache_hash, _etag, _last_modified
     
     current_time = time.time()
     
     # Check if cache is still valid
-    if (page_cache['content'] is not None and 
-        current_time - page_cache['timestamp'] < CACHE_DURATION):
+    if _cache_content is not None and current_time - _cache_ts < CACHE_DURATION:
         logger.debug("Using cached content")
-        return page_cache['content']
+        return _cache_content
     
     # Check rate limiting
     if is_rate_limited():
         logger.warning("Rate limit reached, using cached content")
-        return page_cache['content'] if page_cache['content'] is not None else []
+        return _cache_content if _cache_content is not None else []
     
     try:
-        logger.info(f"Fetching data from {NASDAQ_URL}")
-        response = session.get(NASDAQ_URL, timeout=REQUEST_TIMEOUT)
+        logger.debug("Fetching data from %s", NASDAQ_URL)
+        # Let the server skip the body when the page hasn't changed
+        headers = {'Accept-Encoding': 'gzip, deflate'}
+        if _cache_content is not None:
+            if _etag:
+                headers['If-None-Match'] = _etag
+            if _last_modified:
+                headers['If-Modified-Since'] = _last_modified
+        
+        response = await request_with_retry('GET', NASDAQ_URL, headers=headers)
+        if response.status_code == 304:
+            logger.debug("Content not modified, using cache")
+            return _cache_content or []
         response.raise_for_status()
+        validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
         
-        # Check if content has changed
-        content_hash = get_page_hash(response.text)
-        if content_hash == page_cache['hash']:
-            logger.debug("Content unchanged, using cache")
-            return page_cache['content']
+        # Find the tab content div, scanning the raw bytes
+        section = find_tab_section(response.content)
+        if section is None:
+            logger.error("Could not find the NASDAQ tab content")
+            return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Check if the tab content has changed, ignoring churn elsewhere on the page
+        content_hash = get_page_hash(section)
+        if content_hash == _cache_hash:
+            logger.debug("Content unchanged, using cache")
+            _etag, _last_modified = validators
+            return _cache_content
         
         # Find the table inside the tab content div
-        tab_content = soup.find('div', {'id': 'NASDAQ-tab-2025', 'class': 'tab-content'})
-        if not tab_content:
-            logger.error("Could not find the NASDAQ tab content")
-            return []
-            
-        table = tab_content.find('table', {'width': '100%'})
+        table = TABLE_RE.search(section)
         if not table:
             logger.error("Could not find the rule filings table")
             return []
             
-        rows = table.find_all('tr')[1:]  # Skip header row
+        rows = ROW_RE.findall(table.group(1))[1:]  # Skip header row
+        if not rows:
+            logger.error("Could not find any rule filing rows in the table")
+            return []
         entries = []
         
         for row in rows:
-            entry = parse_table_row(row)
+            entry = parse_table_row(row, seen_entries)
             if entry:
                 entries.append(entry)
         
+        # Rows that are all seen are expected; rows with no rule filing link mean the markup changed
+        if not entries and not any(get_rule_filing_id(row)[0] for row in rows):
+            logger.error("Could not find any rule filing links in the table rows")
+            return []
+        
         # Update cache
-        page_cache = {
-            'content': entries,
-            'timestamp': current_time,
-            'hash': content_hash
-        }
+        _cache_content, _cache_ts, _cache_hash = entries, current_time, content_hash
+        _etag, _last_modified = validators
         
-        logger.info(f"Successfully scraped {len(entries)} entries from Nasdaq")
+        logger.debug("Fetched %d unseen entries from %s", len(entries), NASDAQ_URL)
         return entries
     except Exception as e:
         logger.error(f"Error scraping Nasdaq: {e}")
         return []
 
-def signal_handler(signum, frame):
+def signal_handler(main_task):
     """Handle termination signals gracefully."""
     logger.info("Received termination signal. Cleaning up...")
-    session.close()
-    sys.exit(0)
+    main_task.cancel()
 
-# Register signal handlers
-signal.signal(signal.SIGTERM, signal_handler)
-signal.signal(signal.SIGINT, signal_handler)
-
-def load_seen_entries():
-    """Load previously seen entries from file."""
+def load_legacy_seen_entries():
+    """Load previously seen entries from the legacy JSON file."""
     try:
         if os.path.exists(SEEN_ENTRIES_FILE):
             with open(SEEN_ENTRIES_FILE, 'r') as f:
@@ -222,116 +317,184 @@ def load_seen_entries():
         logger.error(f"Error loading seen entries: {e}. Starting with empty list.")
     return []
 
-def save_seen_entries(entries):
-    """Save seen entries to file."""
+def open_seen_db():
+    """Open the seen entries database, importing the legacy JSON file on first run."""
+    conn = sqlite3.connect(SEEN_ENTRIES_DB)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, ts REAL)')
+    
+    if conn.execute('SELECT 1 FROM seen LIMIT 1').fetchone() is None:
+        legacy_entries = load_legacy_seen_entries()
+        if legacy_entries:
+            save_seen_entries(conn, legacy_entries)
+            logger.info(f"Imported {len(legacy_entries)} entries from {SEEN_ENTRIES_FILE}")
+    return conn
+
+def load_seen_entries(conn):
+    """Load previously seen entry IDs from the database."""
+    return {row[0] for row in conn.execute('SELECT id FROM seen')}
+
+def save_seen_entries(conn, entry_ids):
+    """Record newly seen entry IDs in the database."""
+    now = time.time()
     try:
-        with open(SEEN_ENTRIES_FILE, 'w') as f:
-            json.dump(entries, f)
-        logger.debug(f"Successfully saved {len(entries)} entries to {SEEN_ENTRIES_FILE}")
-    except Exception as e:
+        with conn:
+            conn.executemany('INSERT OR IGNORE INTO seen (id, ts) VALUES (?, ?)',
+                             [(entry_id, now) for entry_id in entry_ids])
+        logger.debug(f"Successfully saved {len(entry_ids)} entries to {SEEN_ENTRIES_DB}")
+    except sqlite3.Error as e:
         logger.error(f"Error saving seen entries: {e}")
 
-def send_to_discord(rule_filing, description, status, sec_notice, comment_period, notice_date):
-    """Send message to Discord webhook."""
+def truncate(text, limit):
+    """Shorten text to at most limit characters, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+def build_embed(entry):
+    """Build a Discord embed for a rule filing entry, within Discord's size limits."""
+    fields = [
+        {"name": "Status", "value": entry['Status'], "inline": True},
+        {"name": "SEC Notice", "value": entry['Noticed by the SEC for Comment'], "inline": True},
+        {"name": "Comment Period", "value": entry['Expiration of the SEC Comment Period'], "inline": True},
+        {"name": "Notice Date", "value": entry['Federal Register Notice Date'], "inline": True}
+    ]
+    # Discord rejects empty field values
+    fields = [dict(field, value=truncate(field['value'], DISCORD_MAX_FIELD_VALUE_CHARS))
+              for field in fields if field['value']]
+    title = truncate(entry['Rule Filing'], DISCORD_MAX_TITLE_CHARS)
+    
+    # The description takes whatever is left of the per-message total
+    remaining = DISCORD_MAX_EMBED_CHARS - len(title) - sum(len(f['name']) + len(f['value']) for f in fields)
+    return {
+        "title": title,
+        "description": truncate(entry['Description'], min(DISCORD_MAX_DESCRIPTION_CHARS, remaining)),
+        "fields": fields
+    }
+
+def embed_size(embed):
+    """Count the characters Discord charges against an embed."""
+    return (len(embed['title']) + len(embed['description']) +
+            sum(len(field['name']) + len(field['value']) for field in embed['fields']))
+
+def batch_entries(entries):
+    """Split entries into batches that fit in a single Discord message."""
+    batches = []
+    batch, batch_size = [], 0
+    for entry, embed in entries:
+        size = embed_size(embed)
+        if batch and (len(batch) == DISCORD_MAX_EMBEDS or batch_size + size > DISCORD_MAX_EMBED_CHARS):
+            batches.append(batch)
+            batch, batch_size = [], 0
+        batch.append((entry, embed))
+        batch_size += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+async def send_to_discord_batch(batch):
+    """Send a batch of entries to Discord webhook as a single message."""
     if not DISCORD_WEBHOOK_URL:
         logger.error("Discord webhook URL not set in .env file")
         return False
 
     # Get current timestamp in ISO format with timezone
-    current_time = datetime.now(timezone.utc).isoformat()
-
-    message = f"**Rule Filing:** {rule_filing}\n"
-    message += f"**Description:** {description}\n"
-    message += f"**Status:** {status}\n"
-    if sec_notice:
-        message += f"**SEC Notice:** {sec_notice}\n"
-    if comment_period:
-        message += f"**Comment Period:** {comment_period}\n"
-    if notice_date:
-        message += f"**Notice Date:** {notice_date}\n"
-    message += f"**Timestamp:** {current_time}\n"
-    
+    t = time.time()
+    current_time = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t)) + f'.{int((t % 1) * 1e6):06d}+00:00'
+
     payload = {
-        "content": message
+        "embeds": [dict(embed, timestamp=current_time) for _, embed in batch]
     }
+    rule_filings = ", ".join(entry['Rule Filing'] for entry, _ in batch)
     
     try:
-        response = session.post(DISCORD_WEBHOOK_URL, json=payload, timeout=REQUEST_TIMEOUT)
+        response = await request_with_retry('POST', DISCORD_WEBHOOK_URL, idempotent=False, json=payload)
         response.raise_for_status()
-        logger.info(f"Successfully sent message to Discord: {rule_filing}")
+        logger.info(f"Successfully sent message to Discord: {rule_filings}")
         return True
     except Exception as e:
         logger.error(f"Error sending to Discord: {e}")
         return False
 
-def main():
+async def main():
     """Main function to monitor Nasdaq rule filings."""
+    global client
     logger.info("Starting Nasdaq rule filings monitor...")
-    logger.info(f"Check interval: {CHECK_INTERVAL} seconds")
+    logger.info(f"Check interval: {CHECK_INTERVAL} seconds (jitter: {CHECK_JITTER} seconds)")
     logger.info(f"Error retry interval: {ERROR_RETRY_INTERVAL} seconds")
     logger.info(f"Request timeout: {REQUEST_TIMEOUT} seconds")
     logger.info(f"Max retries: {MAX_RETRIES}")
     logger.info(f"Rate limit: {MAX_REQUESTS_PER_WINDOW} requests per {RATE_LIMIT_WINDOW} seconds")
     
-    seen_entries = load_seen_entries()
+    client = create_client()
+    
+    # Register signal handlers
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, signal_handler, asyncio.current_task())
+    
+    seen_db = open_seen_db()
+    seen_entries = load_seen_entries(seen_db)  # Kept in memory for O(1) membership checks
     logger.info(f"Loaded {len(seen_entries)} previously seen entries")
     
     consecutive_errors = 0
     max_consecutive_errors = 5
     
-    while True:
-        try:
-            # Get current entries
-            current_entries = scrape_nasdaq()
-            
-            # Check for new entries
-            new_entries_count = 0
-            for entry in current_entries:
-                entry_id = entry['Rule Filing']
+    next_tick = time.monotonic()
+    
+    try:
+        while True:
+            try:
+                # Get current entries
+                current_entries = await scrape_nasdaq(seen_entries)
                 
-                if entry_id not in seen_entries:
-                    logger.info(f"New entry found: {entry_id}")
-                    
-                    # Send to Discord
-                    if send_to_discord(
-                        entry['Rule Filing'],
-                        entry['Description'],
-                        entry['Status'],
-                        entry['Noticed by the SEC for Comment'],
-                        entry['Expiration of the SEC Comment Period'],
-                        entry['Federal Register Notice Date']
-                    ):
-                        seen_entries.append(entry_id)
-                        save_seen_entries(seen_entries)
-                        new_entries_count += 1
-            
-            if new_entries_count > 0:
-                logger.info(f"Processed {new_entries_count} new entries")
-            else:
-                logger.debug("No new entries found in this check")
-            
-            # Reset consecutive errors counter on success
-            consecutive_errors = 0
-            
-            # Force garbage collection
-            gc.collect()
-            
-            # Wait before next check
-            time.sleep(CHECK_INTERVAL)
-            
-        except Exception as e:
-            consecutive_errors += 1
-            logger.error(f"Error in main loop: {e}")
-            
-            if consecutive_errors >= max_consecutive_errors:
-                logger.error(f"Too many consecutive errors ({consecutive_errors}). Restarting session...")
-                global session
-                session.close()
-                session = create_session()
+                # Check for new entries; cached results may include entries seen since
+                new_entries = [entry for entry in current_entries if entry['Rule Filing'] not in seen_entries]
+                for entry in new_entries:
+                    logger.info(f"New entry found: {entry['Rule Filing']}")
+                
+                # Send to Discord, up to DISCORD_MAX_EMBEDS entries per message
+                batches = batch_entries([(entry, build_embed(entry)) for entry in new_entries])
+                results = await asyncio.gather(*[send_to_discord_batch(batch) for batch in batches],
+                                               return_exceptions=True)
+                
+                new_ids = [entry['Rule Filing'] for batch, sent in zip(batches, results) if sent is True
+                           for entry, _ in batch]
+                
+                if new_ids:
+                    # Persist once per check rather than once per entry
+                    seen_entries.update(new_ids)
+                    save_seen_entries(seen_db, new_ids)
+                    logger.info(f"Processed {len(new_ids)} new entries")
+                else:
+                    logger.debug("No new entries found in this check")
+                
+                # Reset consecutive errors counter on success
                 consecutive_errors = 0
-            
-            logger.info(f"Waiting {ERROR_RETRY_INTERVAL} seconds before retrying...")
-            time.sleep(ERROR_RETRY_INTERVAL)
+                
+                # Wait until the next check is due, counting the time this check took
+                # Jitter only ever delays a check, so checks stay at least CHECK_INTERVAL apart
+                # and the default cadence stays under MAX_REQUESTS_PER_WINDOW
+                next_tick = max(next_tick + CHECK_INTERVAL + random.uniform(0, CHECK_JITTER), time.monotonic())
+                await asyncio.sleep(max(0, next_tick - time.monotonic()))
+                
+            except Exception as e:
+                consecutive_errors += 1
+                logger.error(f"Error in main loop: {e}")
+                
+                if consecutive_errors >= max_consecutive_errors:
+                    logger.error(f"Too many consecutive errors ({consecutive_errors}). Restarting client...")
+                    await client.aclose()
+                    client = create_client()
+                    consecutive_errors = 0
+                
+                logger.info(f"Waiting {ERROR_RETRY_INTERVAL} seconds before retrying...")
+                await asyncio.sleep(ERROR_RETRY_INTERVAL)
+                next_tick = time.monotonic()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await client.aclose()
+        seen_db.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main())